@@ -1,5 +1,5 @@
 from backend.src.agent.main import create_rag_agent
-from backend.src.agent.interfaces import (
+from backend.src.agent.shared.interfaces import (
     Issue,
     Comment,
     Label,
@@ -1,10 +1,10 @@
-from dataclasses import dataclass
 from deepagents import create_deep_agent
-import sqlite3
+import aiosqlite
+import asyncio
 import logging
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Dict, Optional
 import httpx
-import json
+import orjson
 from langchain.agents.middleware import (
     ModelRequest,
     ModelResponse,
@@ -12,9 +12,11 @@ from langchain.agents.middleware import (
     wrap_model_call,
     wrap_tool_call,
 )
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import SystemMessage, ToolMessage
+from langgraph.errors import GraphBubbleUp
 from langgraph.types import Command
-from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from backend.src.agent.shared.context import TaskContext
 from backend.src.agent.tools.github import (
     get_github_sub_agents,
     GITHUB_SYSTEM_PROMPT,
@@ -22,21 +24,52 @@ from backend.src.agent.tools.github import (
 
 logger = logging.getLogger(__name__)
 
-checkpointer = SqliteSaver(sqlite3.connect("backend/tool-approval.db"))
+PLATFORM_SYSTEM_PROMPTS: Dict[str, SystemMessage] = {
+    "github": GITHUB_SYSTEM_PROMPT,
+}
 
+CHECKPOINT_DB_PATH = "backend/tool-approval.db"
 
-@dataclass
-class TaskContext:
-    platform: str
-    token: str
-    owner: str
-    repository: str
+_checkpointer: Optional[AsyncSqliteSaver] = None
+_checkpointer_lock = asyncio.Lock()
+
+
+async def init_checkpointer() -> AsyncSqliteSaver:
+    """
+    Opens the tool-approval checkpoint database once and returns the shared saver.
+
+    The connection runs in WAL mode so checkpoint writes do not block readers
+    from concurrent agent runs.
+
+    Returns:
+        The shared AsyncSqliteSaver instance.
+    """
+    global _checkpointer
+    async with _checkpointer_lock:
+        if _checkpointer is None:
+            conn = await aiosqlite.connect(CHECKPOINT_DB_PATH)
+            await conn.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+            )
+            _checkpointer = AsyncSqliteSaver(conn)
+    return _checkpointer
+
+
+async def close_checkpointer() -> None:
+    """Closes the checkpoint database connection, if one was opened."""
+    global _checkpointer
+    async with _checkpointer_lock:
+        if _checkpointer is not None:
+            await _checkpointer.conn.close()
+            _checkpointer = None
 
 
 @wrap_tool_call
-def auth_guard_middleware(
+async def auth_guard_middleware(
     request: ToolCallRequest,
-    handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
 ) -> ToolMessage | Command:
     """
     Middleware that intercepts tool calls and handles authentication errors.
@@ -48,22 +81,25 @@ def auth_guard_middleware(
     Returns:
         ToolMessage with error details if authentication fails, otherwise the result from handler.
     """
+    context: TaskContext = request.runtime.context
     tool_name = request.tool.name
-    platform = request.runtime.context.get("platform")
+    tool_call_id = request.tool_call["id"]
+    platform = context.platform
 
     try:
-        return handler(request)
+        return await handler(request)
     except httpx.HTTPStatusError as e:
         status_code = e.response.status_code
 
         try:
-            error_data = e.response.json()
+            error_data = orjson.loads(e.response.content)
             error_message = error_data.get("message", "Unknown error")
-        except (json.JSONDecodeError, AttributeError):
+        except (orjson.JSONDecodeError, AttributeError):
             error_message = f"HTTP {status_code} error"
 
         if status_code == 401:
             return ToolMessage(
+                tool_call_id=tool_call_id,
                 content=f"Authentication required for {tool_name}. "
                 f"The operation requires a valid {platform} token. "
                 f"Error: {error_message}"
@@ -71,6 +107,7 @@ def auth_guard_middleware(
 
         elif status_code == 404:
             return ToolMessage(
+                tool_call_id=tool_call_id,
                 content=f"Resource not found for {tool_name}. "
                 f"This could mean: 1) The repository/issue doesn't exist, "
                 f"2) The repository is private and you don't have access, or "
@@ -79,21 +116,44 @@ def auth_guard_middleware(
             )
         else:
             return ToolMessage(
+                tool_call_id=tool_call_id,
                 content=f"HTTP {status_code} error for {tool_name}: {error_message}"
             )
+    except GraphBubbleUp:
+        # Interrupts raised by a sub-agent's approval gate must reach the graph
+        raise
     except Exception as e:
-        logger.error(f"Unexpected error in tool {tool_name}: {e}", exc_info=True)
+        logger.exception("Unexpected error in tool %s", tool_name)
         return ToolMessage(
+            tool_call_id=tool_call_id,
             content=f"Unexpected error occurred while executing {tool_name}: {str(e)}"
         )
 
 
+def _with_platform_prompt(
+    system_message: Optional[SystemMessage], platform_prompt: SystemMessage
+) -> SystemMessage:
+    """Append a platform prompt to the system message the agent built."""
+    if system_message is None:
+        return platform_prompt
+
+    content = system_message.content
+    addition = platform_prompt.content
+    if isinstance(content, str):
+        return SystemMessage(content=f"{content}\n\n{addition}")
+
+    return SystemMessage(content=[*content, {"type": "text", "text": addition}])
+
+
 @wrap_model_call
-def change_available_tools(
-    request: ModelRequest, handler: Callable[[ModelRequest], ModelResponse]
+async def change_available_tools(
+    request: ModelRequest, handler: Callable[[ModelRequest], Awaitable[ModelResponse]]
 ) -> ModelResponse:
     """
     Middleware that adjusts available tools and system prompts based on platform context.
+
+    The platform prompt is appended to the system prompt deepagents builds,
+    which carries the instructions for delegating to sub-agents and todos.
     
     Args:
         request: The model request containing runtime context and tools.
@@ -102,16 +162,16 @@ def change_available_tools(
     Returns:
         ModelResponse with adjusted tools and system prompt.
     """
-    system_prompt = request.runtime.context.get("system_prompt")
-    platform = request.runtime.context.get("platform")
-    state = request.runtime.state
-    tools = request.tools
+    context: TaskContext = request.runtime.context
+    system_prompt = PLATFORM_SYSTEM_PROMPTS.get(context.platform)
 
-    if platform == "github":
-        system_prompt = GITHUB_SYSTEM_PROMPT
+    if system_prompt is None:
+        return await handler(request)
 
-    return handler(
-        request.override(tools=tools, system_message=system_prompt, state=state)
+    return await handler(
+        request.override(
+            system_message=_with_platform_prompt(request.system_message, system_prompt)
+        )
     )
 
 
@@ -127,9 +187,11 @@ async def create_rag_agent(token: str):
     """
     return create_deep_agent(
         model="openai:gpt-4o-mini",
-        system_prompt=GITHUB_SYSTEM_PROMPT,
         context_schema=TaskContext,
-        middleware=[change_available_tools, auth_guard_middleware],
-        checkpointer=checkpointer,
+        middleware=[
+            change_available_tools,
+            auth_guard_middleware,
+        ],
+        checkpointer=await init_checkpointer(),
         subagents=await get_github_sub_agents(token),
     )
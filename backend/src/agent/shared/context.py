@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class TaskContext:
+    platform: str
+    token: str
+    owner: str
+    repository: str
@@ -1,3 +1,89 @@
+from typing import Any, Dict
+from langchain.tools import ToolRuntime, tool
+
+from backend.src.agent.shared.context import TaskContext
+from backend.src.agent.tools.github.utils import (
+    COMMENT_FRAGMENT,
+    execute_graphql_query,
+)
+
 GITHUB_MCP_COMMENT_TOOLS = [
     "add_issue_comment",
 ]
+
+GITHUB_MCP_COMMENT_WRITE_TOOLS = frozenset({"add_issue_comment"})
+
+UPDATE_COMMENT_MUTATION = f"""
+mutation UpdateIssueComment($id: ID!, $body: String!) {{
+  updateIssueComment(input: {{id: $id, body: $body}}) {{
+    issueComment {{
+      ...CommentFields
+    }}
+  }}
+}}
+{COMMENT_FRAGMENT}
+"""
+
+DELETE_COMMENT_MUTATION = """
+mutation DeleteIssueComment($id: ID!) {
+  deleteIssueComment(input: {id: $id}) {
+    clientMutationId
+  }
+}
+"""
+
+
+def format_comment_graphql(comment: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formats a CommentFields GraphQL node into a dict.
+
+    Args:
+        comment: GraphQL issue comment node selected with COMMENT_FRAGMENT.
+
+    Returns:
+        Dictionary with the comment's fields.
+    """
+    return {
+        "id": comment.get("id"),
+        "body": comment.get("body"),
+        "created_at": comment.get("createdAt"),
+        "updated_at": comment.get("updatedAt"),
+        "url": comment.get("url"),
+        "author": (comment.get("author") or {}).get("login"),
+    }
+
+
+@tool("update_comment")
+async def update_comment_graphql(
+    comment_id: str,
+    body: str,
+    runtime: ToolRuntime[TaskContext],
+) -> Dict[str, Any]:
+    """
+    Replace the body of an existing issue comment.
+
+    Args:
+        comment_id: The comment's GraphQL node ID.
+        body: The new comment body in Markdown.
+    """
+    data = await execute_graphql_query(
+        runtime, UPDATE_COMMENT_MUTATION, {"id": comment_id, "body": body}
+    )
+
+    return format_comment_graphql(data["updateIssueComment"]["issueComment"])
+
+
+@tool("delete_comment")
+async def delete_comment_graphql(
+    comment_id: str,
+    runtime: ToolRuntime[TaskContext],
+) -> Dict[str, Any]:
+    """
+    Delete an issue comment.
+
+    Args:
+        comment_id: The comment's GraphQL node ID.
+    """
+    await execute_graphql_query(runtime, DELETE_COMMENT_MUTATION, {"id": comment_id})
+
+    return {"deleted": True, "id": comment_id}
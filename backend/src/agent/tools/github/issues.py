@@ -1,6 +1,337 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from langchain.tools import ToolRuntime, tool
+
+from backend.src.agent.shared.context import TaskContext
+from backend.src.agent.tools.github.utils import (
+    ISSUE_BRANCHES_FRAGMENT,
+    ISSUE_CORE_FRAGMENT,
+    ISSUE_PULL_REQUESTS_FRAGMENT,
+    ISSUE_RELATIONS_FRAGMENT,
+    execute_graphql_query,
+    remember_issue_id,
+)
+
 GITHUB_MCP_ISSUE_TOOLS = [
     "issue_write",
     "list_issues",
     "search_issues",
     "sub_issue_write",
 ]
+
+GITHUB_MCP_ISSUE_WRITE_TOOLS = frozenset({"issue_write", "sub_issue_write"})
+
+MAX_BULK_ISSUES = 50
+
+IssueInclude = Literal["branches", "pull_requests", "relations"]
+
+# include option -> (fragment name, fragment), in the order they are selected
+ISSUE_INCLUDE_FRAGMENTS: Dict[str, Tuple[str, str]] = {
+    "branches": ("IssueBranchFields", ISSUE_BRANCHES_FRAGMENT),
+    "pull_requests": ("IssuePullRequestFields", ISSUE_PULL_REQUESTS_FRAGMENT),
+    "relations": ("IssueRelationsFields", ISSUE_RELATIONS_FRAGMENT),
+}
+
+_EMPTY: Dict[str, Any] = {}
+
+
+def _nodes(parent: Dict[str, Any], connection: str) -> Any:
+    """Returns a connection's nodes, or an empty tuple if it is missing or empty."""
+    return (parent.get(connection) or _EMPTY).get("nodes") or ()
+
+
+def _repo_name(node: Dict[str, Any]) -> Optional[str]:
+    """Returns the nameWithOwner of a node's repository, if selected."""
+    return (node.get("repository") or _EMPTY).get("nameWithOwner")
+
+
+def _login(node: Dict[str, Any]) -> Optional[str]:
+    """Returns the login of a node's author, if any."""
+    author = node.get("author")
+    return author["login"] if author else None
+
+
+def _issue_labels(issue: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Returns the labels selected on an issue node as dicts."""
+    return [
+        {
+            "id": label.get("id"),
+            "name": label.get("name"),
+            "description": label.get("description"),
+            "color": label.get("color"),
+        }
+        for label in _nodes(issue, "labels")
+    ]
+
+
+def format_issue_reference(node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formats a related issue node (tracked, sub-issue or parent) into a dict.
+
+    Args:
+        node: GraphQL issue node with id, number, title, url, state and repository.
+
+    Returns:
+        Dictionary describing the related issue.
+    """
+    get = node.get
+
+    return {
+        "id": get("id"),
+        "number": get("number"),
+        "title": get("title"),
+        "url": get("url"),
+        "state": get("state"),
+        "repository": _repo_name(node),
+        "author": _login(node),
+    }
+
+
+def format_linked_branch(branch: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formats a linked branch node into a dict.
+
+    Args:
+        branch: GraphQL linked branch node with id and ref.
+
+    Returns:
+        Dictionary with the branch ID, name and repository.
+    """
+    ref = branch.get("ref") or _EMPTY
+
+    return {
+        "id": branch.get("id"),
+        "name": ref.get("name"),
+        "repository": _repo_name(ref),
+    }
+
+
+def format_issue_relations(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formats the optional cross-reference fragments selected on an issue node.
+
+    Only the parts that were selected are included, so an issue fetched
+    without them gets no empty relation keys.
+
+    Args:
+        issue: GraphQL issue node selected with any of ISSUE_INCLUDE_FRAGMENTS.
+
+    Returns:
+        Dictionary with the linked branches, closing pull requests and related
+        issues that were fetched.
+    """
+    relations: Dict[str, Any] = {}
+
+    if "linkedBranches" in issue:
+        relations["linked_branches"] = [
+            format_linked_branch(branch)
+            for branch in _nodes(issue, "linkedBranches")
+        ]
+
+    if "closedByPullRequestsReferences" in issue:
+        relations["closed_by_pull_requests"] = [
+            {
+                "id": pull_request.get("id"),
+                "number": pull_request.get("number"),
+                "title": pull_request.get("title"),
+                "url": pull_request.get("url"),
+                "state": pull_request.get("state"),
+                "merge_commit": (pull_request.get("mergeCommit") or _EMPTY).get("oid"),
+            }
+            for pull_request in _nodes(issue, "closedByPullRequestsReferences")
+        ]
+
+    if "trackedIssues" in issue:
+        parent: Optional[Dict[str, Any]] = issue.get("parent")
+        relations.update(
+            {
+                "tracked_issues": [
+                    format_issue_reference(node)
+                    for node in _nodes(issue, "trackedIssues")
+                ],
+                "tracked_in_issues": [
+                    format_issue_reference(node)
+                    for node in _nodes(issue, "trackedInIssues")
+                ],
+                "sub_issues": [
+                    format_issue_reference(node)
+                    for node in _nodes(issue, "subIssues")
+                ],
+                "parent": format_issue_reference(parent) if parent else None,
+            }
+        )
+
+    return relations
+
+
+def format_issue_graphql(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formats an issue GraphQL node into a flat issue dict.
+
+    Cross-reference fields are only included for the fragments the node was
+    selected with, see format_issue_relations.
+
+    Args:
+        issue: GraphQL issue node selected with ISSUE_CORE_FRAGMENT and
+            optionally any of ISSUE_INCLUDE_FRAGMENTS.
+
+    Returns:
+        Dictionary with the issue's fields, labels, assignees and, if fetched, relations.
+    """
+    get = issue.get
+    milestone: Optional[Dict[str, Any]] = get("milestone")
+
+    formatted = {
+        "id": get("id"),
+        "number": get("number"),
+        "title": get("title"),
+        "body": get("body"),
+        "state": get("state"),
+        "created_at": get("createdAt"),
+        "updated_at": get("updatedAt"),
+        "closed_at": get("closedAt"),
+        "url": get("url"),
+        "author": _login(issue),
+        "assignees": [assignee["login"] for assignee in _nodes(issue, "assignees")],
+        "labels": _issue_labels(issue),
+        "milestone": (
+            {
+                "number": milestone.get("number"),
+                "title": milestone.get("title"),
+                "state": milestone.get("state"),
+            }
+            if milestone
+            else None
+        ),
+        "comments_count": (get("comments") or _EMPTY).get("totalCount", 0),
+        "locked": get("locked"),
+        "active_lock_reason": get("activeLockReason"),
+    }
+
+    formatted.update(format_issue_relations(issue))
+
+    return formatted
+
+
+@lru_cache(maxsize=MAX_BULK_ISSUES * 2**len(ISSUE_INCLUDE_FRAGMENTS))
+def build_bulk_issues_query(count: int, include: Tuple[str, ...]) -> str:
+    """
+    Builds the aliased GetIssuesBulk document for a number of issues.
+
+    The document only depends on its shape, so it is built once per
+    (count, include) and reused across calls.
+
+    Args:
+        count: Number of issues, aliased i0..i{count - 1} with variables $n0...
+        include: Keys of ISSUE_INCLUDE_FRAGMENTS to select next to
+            ISSUE_CORE_FRAGMENT, in ISSUE_INCLUDE_FRAGMENTS order.
+
+    Returns:
+        The GraphQL query document.
+    """
+    selected = [ISSUE_INCLUDE_FRAGMENTS[name] for name in include]
+    spreads = " ".join(
+        ["...IssueCoreFields"] + [f"...{name}" for name, _ in selected]
+    )
+    fragments = "\n".join(
+        [ISSUE_CORE_FRAGMENT] + [fragment for _, fragment in selected]
+    )
+
+    variable_definitions = ", ".join(f"$n{index}: Int!" for index in range(count))
+    issue_selections = "\n        ".join(
+        f"i{index}: issue(number: $n{index}) {{ {spreads} }}" for index in range(count)
+    )
+
+    return f"""
+    query GetIssuesBulk($owner: String!, $name: String!, {variable_definitions}) {{
+      repository(owner: $owner, name: $name) {{
+        {issue_selections}
+      }}
+    }}
+    {fragments}
+    """
+
+
+def _is_missing_issue_error(error: Dict[str, Any]) -> bool:
+    """Whether a GraphQL error only reports one aliased issue as not found."""
+    path = error.get("path") or ()
+    return (
+        error.get("type") == "NOT_FOUND"
+        and len(path) == 2
+        and path[0] == "repository"
+        and str(path[1]).startswith("i")
+    )
+
+
+@tool("get_issues_bulk")
+async def get_issues_bulk_graphql(
+    issue_numbers: List[int],
+    runtime: ToolRuntime[TaskContext],
+    include: Optional[List[IssueInclude]] = None,
+) -> Dict[str, Any]:
+    """
+    Get several GitHub issues in the current repository with a single request.
+
+    Prefer this over repeated get_issue_details calls when more than one issue
+    is needed. Numbers that don't exist or are pull requests are listed under
+    "missing" instead of failing the call.
+
+    Args:
+        issue_numbers: Issue numbers to fetch (at most 50 per call).
+        include: Extra details to fetch: "branches" for linked branches,
+            "pull_requests" for pull requests that close the issue, and
+            "relations" for tracked issues, sub-issues and the parent issue.
+    """
+    numbers = list(dict.fromkeys(issue_numbers))
+    if not numbers:
+        return {"issues": [], "missing": []}
+    if len(numbers) > MAX_BULK_ISSUES:
+        raise ValueError(
+            f"get_issues_bulk accepts at most {MAX_BULK_ISSUES} issues per call"
+        )
+    invalid = [number for number in numbers if number < 1]
+    if invalid:
+        raise ValueError(
+            f"Issue numbers must be positive: {', '.join(map(str, invalid))}"
+        )
+
+    include = include or []
+    selected = tuple(name for name in ISSUE_INCLUDE_FRAGMENTS if name in include)
+    query = build_bulk_issues_query(len(numbers), selected)
+
+    variables: Dict[str, Any] = {
+        "owner": runtime.context.owner,
+        "name": runtime.context.repository,
+    }
+    for index, number in enumerate(numbers):
+        variables[f"n{index}"] = number
+
+    # Unknown numbers fail on their own alias next to the found issues, and
+    # that partial result is cached like a complete one
+    data = await execute_graphql_query(
+        runtime, query, variables, tolerate_error=_is_missing_issue_error
+    )
+    repository = data["repository"]
+
+    issues = []
+    missing = []
+    for index, number in enumerate(numbers):
+        issue = repository.get(f"i{index}")
+        if issue:
+            issues.append(issue)
+        else:
+            missing.append(number)
+
+    # Seed the node ID cache so follow-up label mutations skip the lookup
+    for issue in issues:
+        remember_issue_id(
+            runtime.context.owner,
+            runtime.context.repository,
+            issue["number"],
+            issue["id"],
+        )
+
+    return {
+        "issues": [format_issue_graphql(issue) for issue in issues],
+        "missing": missing,
+    }
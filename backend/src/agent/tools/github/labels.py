@@ -1,5 +1,258 @@
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
+from langchain.tools import ToolRuntime, tool
+
+from backend.src.agent.shared.context import TaskContext
+from backend.src.agent.tools.github.utils import (
+    LABEL_FRAGMENT,
+    execute_graphql_query,
+    resolve_issue_and_label_ids,
+)
+
 GITHUB_MCP_LABEL_TOOLS = [
     "get_label",
     "label_write",
     "list_label",
 ]
+
+GITHUB_MCP_LABEL_WRITE_TOOLS = frozenset({"label_write"})
+
+# LabelFields selection -> formatted key, in the same order
+_LABEL_FIELDS = ("id", "name", "description", "color", "isDefault", "url")
+_LABEL_KEYS = ("id", "name", "description", "color", "is_default", "url")
+_label_fields = itemgetter(*_LABEL_FIELDS)
+
+ADD_LABELS_MUTATION = f"""
+mutation AddLabelsToIssue($labelableId: ID!, $labelIds: [ID!]!) {{
+  addLabelsToLabelable(input: {{labelableId: $labelableId, labelIds: $labelIds}}) {{
+    labelable {{
+      ... on Issue {{
+        labels(first: 100) {{
+          nodes {{
+            ...LabelFields
+          }}
+        }}
+      }}
+    }}
+  }}
+}}
+{LABEL_FRAGMENT}
+"""
+
+REMOVE_LABELS_MUTATION = f"""
+mutation RemoveLabelsFromIssue($labelableId: ID!, $labelIds: [ID!]!) {{
+  removeLabelsFromLabelable(input: {{labelableId: $labelableId, labelIds: $labelIds}}) {{
+    labelable {{
+      ... on Issue {{
+        labels(first: 100) {{
+          nodes {{
+            ...LabelFields
+          }}
+        }}
+      }}
+    }}
+  }}
+}}
+{LABEL_FRAGMENT}
+"""
+
+CLEAR_LABELS_MUTATION = f"""
+mutation RemoveAllLabelsFromIssue($labelableId: ID!) {{
+  clearLabelsFromLabelable(input: {{labelableId: $labelableId}}) {{
+    labelable {{
+      ... on Issue {{
+        labels(first: 100) {{
+          nodes {{
+            ...LabelFields
+          }}
+        }}
+      }}
+    }}
+  }}
+}}
+{LABEL_FRAGMENT}
+"""
+
+# Mutation fields run in order, so the clear lands before the add
+SET_LABELS_MUTATION = f"""
+mutation SetIssueLabels($labelableId: ID!, $labelIds: [ID!]!) {{
+  clearLabelsFromLabelable(input: {{labelableId: $labelableId}}) {{
+    clientMutationId
+  }}
+  addLabelsToLabelable(input: {{labelableId: $labelableId, labelIds: $labelIds}}) {{
+    labelable {{
+      ... on Issue {{
+        labels(first: 100) {{
+          nodes {{
+            ...LabelFields
+          }}
+        }}
+      }}
+    }}
+  }}
+}}
+{LABEL_FRAGMENT}
+"""
+
+
+def format_label_graphql(label: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formats a LabelFields GraphQL node into a dict.
+
+    Args:
+        label: GraphQL label node selected with LABEL_FRAGMENT.
+
+    Returns:
+        Dictionary with the label's fields.
+    """
+    try:
+        return dict(zip(_LABEL_KEYS, _label_fields(label)))
+    except KeyError:
+        # Partial selection, e.g. a label fetched without LABEL_FRAGMENT
+        return {
+            key: label.get(field) for key, field in zip(_LABEL_KEYS, _LABEL_FIELDS)
+        }
+
+
+@tool("add_labels_to_issue")
+async def add_labels_to_issue_graphql(
+    issue_number: int,
+    runtime: ToolRuntime[TaskContext],
+    label_names: Optional[List[str]] = None,
+    issue_id: Optional[str] = None,
+    label_ids: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Add existing repository labels to an issue and return the issue's labels.
+
+    Args:
+        issue_number: The issue number.
+        label_names: Names of the labels to add.
+        issue_id: The issue's GraphQL node ID if already known, e.g. from
+            get_issues_bulk. It must be the ID of issue_number.
+        label_ids: Node IDs of labels to add if already known, e.g. from
+            get_issue_labels. They must be labels of this repository.
+    """
+    if not label_names and not label_ids:
+        raise ValueError("Provide label_names or label_ids")
+
+    issue_id, label_ids = await resolve_issue_and_label_ids(
+        runtime, issue_number, label_names or [], issue_id, label_ids
+    )
+
+    data = await execute_graphql_query(
+        runtime,
+        ADD_LABELS_MUTATION,
+        {"labelableId": issue_id, "labelIds": label_ids},
+    )
+    labels_data = data["addLabelsToLabelable"]["labelable"]["labels"]
+
+    return {"labels": list(map(format_label_graphql, labels_data["nodes"]))}
+
+
+@tool("remove_labels_from_issue")
+async def remove_labels_from_issue_graphql(
+    issue_number: int,
+    runtime: ToolRuntime[TaskContext],
+    label_names: Optional[List[str]] = None,
+    issue_id: Optional[str] = None,
+    label_ids: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Remove labels from an issue and return the issue's remaining labels.
+
+    Args:
+        issue_number: The issue number.
+        label_names: Names of the labels to remove.
+        issue_id: The issue's GraphQL node ID if already known, e.g. from
+            get_issues_bulk. It must be the ID of issue_number.
+        label_ids: Node IDs of labels to remove if already known, e.g. from
+            get_issue_labels. They must be labels of this repository.
+    """
+    if not label_names and not label_ids:
+        raise ValueError("Provide label_names or label_ids")
+
+    issue_id, label_ids = await resolve_issue_and_label_ids(
+        runtime, issue_number, label_names or [], issue_id, label_ids
+    )
+
+    data = await execute_graphql_query(
+        runtime,
+        REMOVE_LABELS_MUTATION,
+        {"labelableId": issue_id, "labelIds": label_ids},
+    )
+    labels_data = data["removeLabelsFromLabelable"]["labelable"]["labels"]
+
+    return {"labels": list(map(format_label_graphql, labels_data["nodes"]))}
+
+
+@tool("remove_all_labels_from_issue")
+async def remove_all_labels_from_issue_graphql(
+    issue_number: int,
+    runtime: ToolRuntime[TaskContext],
+    issue_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Remove every label from an issue.
+
+    Args:
+        issue_number: The issue number.
+        issue_id: The issue's GraphQL node ID if already known, e.g. from
+            get_issues_bulk. It must be the ID of issue_number.
+    """
+    issue_id, _ = await resolve_issue_and_label_ids(
+        runtime, issue_number, [], issue_id
+    )
+
+    data = await execute_graphql_query(
+        runtime, CLEAR_LABELS_MUTATION, {"labelableId": issue_id}
+    )
+    labels_data = data["clearLabelsFromLabelable"]["labelable"]["labels"]
+
+    return {"labels": list(map(format_label_graphql, labels_data["nodes"]))}
+
+
+@tool("set_issue_labels")
+async def set_issue_labels_graphql(
+    issue_number: int,
+    runtime: ToolRuntime[TaskContext],
+    label_names: Optional[List[str]] = None,
+    issue_id: Optional[str] = None,
+    label_ids: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Replace all labels on an issue with the given labels.
+
+    Args:
+        issue_number: The issue number.
+        label_names: Names of the labels the issue should have. An empty
+            list, with no label_ids, removes every label.
+        issue_id: The issue's GraphQL node ID if already known, e.g. from
+            get_issues_bulk. It must be the ID of issue_number.
+        label_ids: Node IDs of labels the issue should have if already
+            known, e.g. from get_issue_labels. They must be labels of this repository.
+    """
+    # Omitting both is ambiguous, so clearing needs an explicit empty list
+    if label_names is None and label_ids is None:
+        raise ValueError(
+            "Provide label_names or label_ids, or [] to remove all labels"
+        )
+
+    issue_id, label_ids = await resolve_issue_and_label_ids(
+        runtime, issue_number, label_names or [], issue_id, label_ids
+    )
+
+    if not label_ids:
+        data = await execute_graphql_query(
+            runtime, CLEAR_LABELS_MUTATION, {"labelableId": issue_id}
+        )
+        labels_data = data["clearLabelsFromLabelable"]["labelable"]["labels"]
+    else:
+        data = await execute_graphql_query(
+            runtime,
+            SET_LABELS_MUTATION,
+            {"labelableId": issue_id, "labelIds": label_ids},
+        )
+        labels_data = data["addLabelsToLabelable"]["labelable"]["labels"]
+
+    return {"labels": list(map(format_label_graphql, labels_data["nodes"]))}
@@ -1,18 +1,41 @@
-from typing import Any, List, Tuple
+import asyncio
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple, Type, Union
 from deepagents import CompiledSubAgent
 from langchain.agents import create_agent
-from langchain_core.messages import SystemMessage
+from langchain.agents.middleware import (
+    HumanInTheLoopMiddleware,
+    ToolCallRequest,
+    wrap_tool_call,
+)
+from langchain_core.messages import SystemMessage, ToolMessage
 from langchain_core.tools import StructuredTool, BaseTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langgraph.types import Command
 
 from backend.src.agent.tools.github.comments import (
-    update_comment_graphql,
+    GITHUB_MCP_COMMENT_TOOLS,
+    GITHUB_MCP_COMMENT_WRITE_TOOLS,
     delete_comment_graphql,
+    update_comment_graphql,
+)
+from backend.src.agent.tools.github.issues import (
+    GITHUB_MCP_ISSUE_TOOLS,
+    GITHUB_MCP_ISSUE_WRITE_TOOLS,
+    get_issues_bulk_graphql,
+)
+from backend.src.agent.tools.github.labels import (
+    GITHUB_MCP_LABEL_TOOLS,
+    GITHUB_MCP_LABEL_WRITE_TOOLS,
+    add_labels_to_issue_graphql,
+    remove_all_labels_from_issue_graphql,
+    remove_labels_from_issue_graphql,
+    set_issue_labels_graphql,
 )
-from backend.src.agent.tools.github.issues import GITHUB_MCP_ISSUE_TOOLS
-from backend.src.agent.tools.github.labels import GITHUB_MCP_LABEL_TOOLS
-from backend.src.agent.tools.github.comments import GITHUB_MCP_COMMENT_TOOLS
-from pydantic import create_model
+from backend.src.agent.tools.github.utils import invalidate_response_cache
+from pydantic import BaseModel, create_model
 
 
 GITHUB_SYSTEM_PROMPT = SystemMessage(
@@ -28,8 +51,21 @@ When working with GitHub resources, prefer using the MCP-based tools for better
 """
 )
 
+SUB_AGENT_MODEL = "openai:gpt-4o-mini"
 
-GRAPHQL_URL = "https://api.github.com/graphql"
+SUB_AGENT_CACHE_MAX_SIZE = 256
+
+# MCP tools that change GitHub state behind the GraphQL response cache
+GITHUB_MCP_WRITE_TOOLS = (
+    GITHUB_MCP_ISSUE_WRITE_TOOLS
+    | GITHUB_MCP_COMMENT_WRITE_TOOLS
+    | GITHUB_MCP_LABEL_WRITE_TOOLS
+)
+
+# sha256 of token -> build of that token's sub-agents
+_sub_agent_builds: "OrderedDict[str, asyncio.Future[List[CompiledSubAgent]]]" = (
+    OrderedDict()
+)
 
 
 def get_mcp_client(token: str):
@@ -44,38 +80,120 @@ def get_mcp_client(token: str):
     )
 
 
+@wrap_tool_call
+async def invalidate_cache_after_write_middleware(
+    request: ToolCallRequest,
+    handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+) -> ToolMessage | Command:
+    """
+    Middleware that drops cached GraphQL reads after an MCP write tool runs.
+
+    The in-repo GraphQL mutations invalidate the cache themselves, but MCP
+    writes bypass it, so without this the agent would read back its own
+    write as unchanged until the cached responses expire.
+
+    Args:
+        request: The tool call request containing the tool name and arguments.
+        handler: The next handler in the middleware chain.
+
+    Returns:
+        The result from handler.
+    """
+    result = await handler(request)
+
+    if request.tool_call["name"] in GITHUB_MCP_WRITE_TOOLS:
+        args = request.tool_call["args"]
+        context = request.runtime.context
+        invalidate_response_cache(
+            args.get("owner", context.owner), args.get("repo", context.repository)
+        )
+
+    return result
+
+
+def select_mcp_tools(
+    mcp_tools_by_name: Dict[str, BaseTool], tool_names: Iterable[str]
+) -> List[BaseTool]:
+    """
+    Picks the named MCP tools that the server provides, in the given order.
+
+    Args:
+        mcp_tools_by_name: MCP tools keyed by tool name.
+        tool_names: Names of the tools to pick.
+
+    Returns:
+        List of the matching MCP tools.
+    """
+    return [
+        mcp_tools_by_name[name] for name in tool_names if name in mcp_tools_by_name
+    ]
+
+
+@lru_cache(maxsize=8)
+def _model_without_field(model: Type[BaseModel], field_name: str) -> Type[BaseModel]:
+    """Build a copy of a Pydantic model without one field, once per model."""
+    fields = {
+        name: (field.annotation, field)
+        for name, field in model.model_fields.items()
+        if name != field_name
+    }
+    return create_model(f"{model.__name__}Without{field_name.title()}", **fields)
+
+
+def schema_without_argument(
+    schema: Union[Type[BaseModel], Dict[str, Any]], argument: str
+) -> Union[Type[BaseModel], Dict[str, Any]]:
+    """
+    Returns a tool args schema with one argument removed.
+
+    MCP tools describe their arguments as JSON schema dicts, which are
+    trimmed directly. Pydantic models are rebuilt without the field, and the
+    result is cached per model so repeat agent builds skip create_model.
+
+    Args:
+        schema: JSON schema dict or Pydantic model describing the arguments.
+        argument: Name of the argument to remove.
+
+    Returns:
+        A schema of the same kind without the argument.
+    """
+    if isinstance(schema, dict):
+        return {
+            **schema,
+            "properties": {
+                name: value
+                for name, value in schema.get("properties", {}).items()
+                if name != argument
+            },
+            "required": [
+                name for name in schema.get("required", []) if name != argument
+            ],
+        }
+
+    return _model_without_field(schema, argument)
+
+
 def create_method_specific_tools(
-    mcp_tools: List[BaseTool],
+    mcp_tools_by_name: Dict[str, BaseTool],
 ) -> Tuple[List[StructuredTool], List[StructuredTool], List[StructuredTool]]:
     """
     Create method-specific variants of multi-method MCP tools with inherited schemas.
     
     Args:
-        mcp_tools: List of MCP tools to process.
+        mcp_tools_by_name: MCP tools keyed by tool name.
         
     Returns:
         Tuple of (issue_tools, comment_tools, label_tools) lists.
     """
-    issue_read_tool = next(
-        (tool for tool in mcp_tools if tool.name == "issue_read"), None
-    )
+    issue_read_tool = mcp_tools_by_name.get("issue_read")
 
     if not issue_read_tool:
         return [], [], []
 
     original_schema = issue_read_tool.args_schema
-    IssueReadWithoutMethod = None
-
-    if original_schema:
-        fields_without_method = {
-            name: (field.type_, field.default if field.default is not ... else ...)
-            for name, field in original_schema.__fields__.items()
-            if name != "method"
-        }
-
-        IssueReadWithoutMethod = create_model(
-            "IssueReadWithoutMethod", **fields_without_method
-        )
+    IssueReadWithoutMethod = (
+        schema_without_argument(original_schema, "method") if original_schema else None
+    )
 
     def create_method_wrapper(
         method_name: str, tool_name: str, description: str
@@ -97,7 +215,7 @@ def create_method_specific_tools(
             return await issue_read_tool.ainvoke(kwargs)
 
         return StructuredTool.from_function(
-            func=wrapper,
+            coroutine=wrapper,
             name=tool_name,
             description=description,
             args_schema=IssueReadWithoutMethod,
@@ -121,99 +239,213 @@ def create_method_specific_tools(
         "Get all labels assigned to a specific GitHub issue",
     )
 
-    return [issue_tool], [comments_tool], [labels_tool]
+    bundle_parts = {"issue": "get", "comments": "get_comments", "labels": "get_labels"}
+
+    async def get_issue_bundle(**kwargs: Any) -> Dict[str, Any]:
+        # Wait for every part, so one failed read doesn't discard the others
+        # or leave them running unobserved
+        results = await asyncio.gather(
+            *(
+                issue_read_tool.ainvoke({**kwargs, "method": method_name})
+                for method_name in bundle_parts.values()
+            ),
+            return_exceptions=True,
+        )
+
+        bundle: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for part, result in zip(bundle_parts, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                bundle[part] = None
+                errors[part] = str(result)
+            else:
+                bundle[part] = result
+
+        if len(errors) == len(bundle_parts):
+            raise results[0]
+        if errors:
+            bundle["errors"] = errors
+        return bundle
+
+    bundle_tool = StructuredTool.from_function(
+        coroutine=get_issue_bundle,
+        name="get_issue_bundle",
+        description=(
+            "Get a GitHub issue's details, comments and labels in one call. "
+            "Prefer this over separate calls when more than one of them is needed. "
+            "A part that failed is null, with its error under errors"
+        ),
+        args_schema=IssueReadWithoutMethod,
+    )
+
+    return [issue_tool, bundle_tool], [comments_tool], [labels_tool]
 
 
 def get_issue_agent(
-    mcp_tools: List[BaseTool], specialized_issue_tools: List[StructuredTool]
+    mcp_tools_by_name: Dict[str, BaseTool],
+    specialized_issue_tools: List[StructuredTool],
 ) -> Any:
     """
     Creates an issue agent with appropriate tools and interrupt configuration.
     
     Args:
-        mcp_tools: List of MCP tools available.
+        mcp_tools_by_name: MCP tools keyed by tool name.
         specialized_issue_tools: List of specialized issue tools.
         
     Returns:
         Configured agent instance for issue operations.
     """
-    base_tools = [tool for tool in mcp_tools if tool.name in GITHUB_MCP_ISSUE_TOOLS]
+    base_tools = select_mcp_tools(mcp_tools_by_name, GITHUB_MCP_ISSUE_TOOLS)
 
-    all_tools = base_tools + specialized_issue_tools
+    graphql_only_tools = [get_issues_bulk_graphql]
+    all_tools = base_tools + specialized_issue_tools + graphql_only_tools
 
     return create_agent(
+        SUB_AGENT_MODEL,
         name="issue_agent",
         tools=all_tools,
-        interrupt_before={
-            "get_issue_details": False,
-            "list_issues": False,
-            "search_issues": False,
-            "issue_write": True,
-            "sub_issue_write": True,
-        },
+        middleware=[
+            invalidate_cache_after_write_middleware,
+            HumanInTheLoopMiddleware(
+                interrupt_on={
+                    "get_issue_details": False,
+                    "get_issue_bundle": False,
+                    "get_issues_bulk": False,
+                    "list_issues": False,
+                    "search_issues": False,
+                    "issue_write": True,
+                    "sub_issue_write": True,
+                }
+            ),
+        ],
     )
 
 
 def get_comment_agent(
-    mcp_tools: List[BaseTool], specialized_comment_tools: List[StructuredTool]
+    mcp_tools_by_name: Dict[str, BaseTool],
+    specialized_comment_tools: List[StructuredTool],
 ) -> Any:
     """
     Creates a comment agent with appropriate tools and interrupt configuration.
     
     Args:
-        mcp_tools: List of MCP tools available.
+        mcp_tools_by_name: MCP tools keyed by tool name.
         specialized_comment_tools: List of specialized comment tools.
         
     Returns:
         Configured agent instance for comment operations.
     """
-    base_tools = [tool for tool in mcp_tools if tool.name in GITHUB_MCP_COMMENT_TOOLS]
+    base_tools = select_mcp_tools(mcp_tools_by_name, GITHUB_MCP_COMMENT_TOOLS)
 
     graphql_only_tools = [update_comment_graphql, delete_comment_graphql]
     all_tools = base_tools + specialized_comment_tools + graphql_only_tools
 
     return create_agent(
+        SUB_AGENT_MODEL,
         name="comment_agent",
         tools=all_tools,
-        interrupt_before={
-            "get_issue_comments": False,
-            "add_issue_comment": True,
-            "update_comment": True,
-            "delete_comment": True,
-        },
+        middleware=[
+            invalidate_cache_after_write_middleware,
+            HumanInTheLoopMiddleware(
+                interrupt_on={
+                    "get_issue_comments": False,
+                    "add_issue_comment": True,
+                    "update_comment": True,
+                    "delete_comment": True,
+                }
+            ),
+        ],
     )
 
 
 def get_label_agent(
-    mcp_tools: List[BaseTool], specialized_label_tools: List[StructuredTool]
+    mcp_tools_by_name: Dict[str, BaseTool],
+    specialized_label_tools: List[StructuredTool],
 ) -> Any:
     """
     Creates a label agent with appropriate tools and interrupt configuration.
     
     Args:
-        mcp_tools: List of MCP tools available.
+        mcp_tools_by_name: MCP tools keyed by tool name.
         specialized_label_tools: List of specialized label tools.
         
     Returns:
         Configured agent instance for label operations.
     """
-    base_tools = [tool for tool in mcp_tools if tool.name in GITHUB_MCP_LABEL_TOOLS]
+    base_tools = select_mcp_tools(mcp_tools_by_name, GITHUB_MCP_LABEL_TOOLS)
 
-    all_tools = base_tools + specialized_label_tools
+    graphql_only_tools = [
+        add_labels_to_issue_graphql,
+        remove_labels_from_issue_graphql,
+        remove_all_labels_from_issue_graphql,
+        set_issue_labels_graphql,
+    ]
+    all_tools = base_tools + specialized_label_tools + graphql_only_tools
 
     return create_agent(
+        SUB_AGENT_MODEL,
         name="label_agent",
         tools=all_tools,
-        interrupt_before={
-            "get_label": False,
-            "list_label": False,
-            "get_issue_labels": False,
-            "label_write": True,
-        },
+        middleware=[
+            invalidate_cache_after_write_middleware,
+            HumanInTheLoopMiddleware(
+                interrupt_on={
+                    "get_label": False,
+                    "list_label": False,
+                    "get_issue_labels": False,
+                    "label_write": True,
+                    "add_labels_to_issue": True,
+                    "remove_labels_from_issue": True,
+                    "remove_all_labels_from_issue": True,
+                    "set_issue_labels": True,
+                }
+            ),
+        ],
     )
 
 
 async def get_github_sub_agents(token: str) -> List[CompiledSubAgent]:
+    """
+    Returns the GitHub sub-agents for a token, building them on first use.
+
+    Building lists the MCP server's tools and compiles three agents, so the
+    result is kept per token (bounded by SUB_AGENT_CACHE_MAX_SIZE) and
+    concurrent first callers share one build. Failed builds are not kept.
+
+    Args:
+        token: GitHub authentication token.
+
+    Returns:
+        List of configured CompiledSubAgent instances.
+    """
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+
+    build = _sub_agent_builds.get(cache_key)
+    if build is None:
+        build = asyncio.ensure_future(build_github_sub_agents(token))
+        _sub_agent_builds[cache_key] = build
+
+        def forget_failed_build(
+            task: "asyncio.Future[List[CompiledSubAgent]]",
+        ) -> None:
+            if task.cancelled() or task.exception() is not None:
+                if _sub_agent_builds.get(cache_key) is task:
+                    del _sub_agent_builds[cache_key]
+
+        build.add_done_callback(forget_failed_build)
+
+        while len(_sub_agent_builds) > SUB_AGENT_CACHE_MAX_SIZE:
+            _sub_agent_builds.popitem(last=False)
+    else:
+        _sub_agent_builds.move_to_end(cache_key)
+
+    # Shield the shared build so one cancelled caller doesn't cancel the others
+    return await asyncio.shield(build)
+
+
+async def build_github_sub_agents(token: str) -> List[CompiledSubAgent]:
     """
     Creates and returns all GitHub sub-agents configured with MCP tools.
     
@@ -225,25 +457,32 @@ async def get_github_sub_agents(token: str) -> List[CompiledSubAgent]:
     """
     mcp_client = get_mcp_client(token)
     mcp_tools = await mcp_client.get_tools()
+    mcp_tools_by_name = {tool.name: tool for tool in mcp_tools}
 
     specialized_issue_tools, specialized_comment_tools, specialized_label_tools = (
-        create_method_specific_tools(mcp_tools)
+        create_method_specific_tools(mcp_tools_by_name)
     )
 
     return [
         CompiledSubAgent(
             name="issue_agent",
-            description="Manage GitHub issues - get issue details, create, update issues and sub-issues",
-            runnable=get_issue_agent(mcp_tools, specialized_issue_tools),
+            description="Manage GitHub issues - get issue details (one or many, or bundled with comments and labels), create, update issues and sub-issues",
+            runnable=get_issue_agent(
+                mcp_tools_by_name, specialized_issue_tools
+            ),
         ),
         CompiledSubAgent(
             name="comment_agent",
             description="Manage GitHub issue comments - get comments, add via MCP, update/delete via GraphQL",
-            runnable=get_comment_agent(mcp_tools, specialized_comment_tools),
+            runnable=get_comment_agent(
+                mcp_tools_by_name, specialized_comment_tools
+            ),
         ),
         CompiledSubAgent(
             name="label_agent",
-            description="Manage GitHub labels - get issue labels, manage repository labels",
-            runnable=get_label_agent(mcp_tools, specialized_label_tools),
+            description="Manage GitHub labels - get issue labels, add/remove/set labels on issues via GraphQL, manage repository labels",
+            runnable=get_label_agent(
+                mcp_tools_by_name, specialized_label_tools
+            ),
         ),
     ]
@@ -1,137 +1,875 @@
+import asyncio
+import hashlib
 import httpx
-import json
-from typing import Dict, Any, List, Optional
-from backend.src.agent.agent import TaskContext
+import logging
+import orjson
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, Any, List, Mapping, Optional, Tuple
+from aiolimiter import AsyncLimiter
+from backend.src.agent.shared.context import TaskContext
 from langchain.tools import ToolRuntime
 
-GRAPHQL_URL = "https://api.github.com/graphql"
+logger = logging.getLogger(__name__)
 
+BASE_URL = "https://api.github.com"
+GRAPHQL_PATH = "/graphql"
 
-def get_graphql_headers(runtime: ToolRuntime[TaskContext]) -> Dict[str, str]:
-    """Get headers for authenticated GraphQL requests"""
-    return {
-        "Authorization": f"Bearer {runtime.context.token}",
+DEFAULT_HEADERS: Mapping[str, str] = MappingProxyType(
+    {
         "Content-Type": "application/json",
         "Accept": "application/json",
     }
+)
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("GH_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("GH_MAX_KEEPALIVE", "50")),
+    keepalive_expiry=30.0,
+)
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GH_CONCURRENCY", "10"))
+MAX_CONCURRENT_REQUESTS_PER_TOKEN = int(
+    os.getenv("GH_TOKEN_CONCURRENCY", str(MAX_CONCURRENT_REQUESTS))
+)
+
+RATE_LIMIT_PER_HOUR = 5000
+BURST_LIMIT_PER_MINUTE = 30
+RATE_LIMIT_LOW_WATERMARK = 100
+MAX_REQUEST_ATTEMPTS = 3
+MAX_RATE_LIMIT_WAIT = 60.0
+RETRY_BACKOFF_BASE = 0.5
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+LABEL_CACHE_TTL = 300.0
+LABEL_CACHE_MAX_REPOSITORIES = 256
+
+ISSUE_ID_CACHE_MAX_SIZE = 10_000
+MISSING_ISSUE_TTL = 30.0
+
+RESPONSE_CACHE_TTL = 60.0
+RESPONSE_CACHE_MAX_SIZE = 512
+
+TOKEN_STATE_MAX_SIZE = 256
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+@dataclass
+class _TokenState:
+    """Per-token request headers, rate limiters, concurrency cap and pacing."""
+
+    headers: Mapping[str, str]
+    hourly_limiter: AsyncLimiter
+    burst_limiter: AsyncLimiter
+    request_semaphore: asyncio.Semaphore
+    # Seconds to keep between sends while the budget is nearly spent
+    pacing_interval: float = 0.0
+    # time.monotonic() before which the next request may not be sent
+    next_send_at: float = 0.0
+
+
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# sha256 of token -> that token's state, least recently used first
+_token_states: "OrderedDict[str, _TokenState]" = OrderedDict()
+
+# cache key -> (cache generation it was sent in, request shared by
+# concurrent identical read queries)
+_inflight_queries: Dict[str, Tuple[int, "asyncio.Future[Dict[str, Any]]"]] = {}
+
+# (owner, repository) -> count of invalidations, so reads that were in flight
+# across a write don't store pre-write data
+_cache_generations: Dict[Tuple[str, str], int] = {}
+
+# (owner, repository) -> {label name: (expires_at, label id)}, filled by lookups
+_label_id_cache: "OrderedDict[Tuple[str, str], Dict[str, Tuple[float, str]]]" = (
+    OrderedDict()
+)
+
+# (owner, repository, issue number) -> issue node ID
+_issue_id_cache: "OrderedDict[Tuple[str, str, int], str]" = OrderedDict()
+
+# (owner, repository, issue number) -> expires_at, for issues that don't exist
+_missing_issue_cache: "OrderedDict[Tuple[str, str, int], float]" = OrderedDict()
+
+# cache key -> (expires_at, (owner, repository), data)
+_response_cache: "OrderedDict[str, Tuple[float, Tuple[str, str], Dict[str, Any]]]" = (
+    OrderedDict()
+)
+
+
+class GraphQLError(Exception):
+    """Raised when a GraphQL response carries errors."""
+
+    def __init__(
+        self, errors: List[Dict[str, Any]], data: Optional[Dict[str, Any]] = None
+    ):
+        self.errors = errors
+        # Partial result GitHub returned next to the errors, if any
+        self.data = data
+        error_messages = [error.get("message", "Unknown error") for error in errors]
+        super().__init__(f"GraphQL errors: {'; '.join(error_messages)}")
+
+    @property
+    def is_not_found(self) -> bool:
+        """Whether any error reports a missing object."""
+        return any(error.get("type") == "NOT_FOUND" for error in self.errors)
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide GitHub HTTP client, creating it on first use.
+
+    A single client keeps TCP/TLS connections to api.github.com alive across
+    tool calls instead of paying a fresh handshake per request, and HTTP/2 lets
+    concurrent calls multiplex over one connection. Auth headers are sent per
+    call since the token comes from each request's context.
+
+    Returns:
+        The shared httpx.AsyncClient instance.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            http2=True,
+            headers=DEFAULT_HEADERS,
+            limits=HTTP_LIMITS,
+            timeout=httpx.Timeout(30.0),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Closes the shared GitHub HTTP client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _get_token_state(token: str) -> _TokenState:
+    """
+    Return a token's request state, creating it on first use.
+
+    State is keyed by a hash of the token so raw secrets are not kept as keys,
+    and at most TOKEN_STATE_MAX_SIZE tokens are kept, least recently used
+    first out.
+
+    Args:
+        token: GitHub authentication token.
+
+    Returns:
+        The token's headers, rate limiters and concurrency cap.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    state = _token_states.get(key)
+    if state is None:
+        state = _TokenState(
+            headers=MappingProxyType({"Authorization": f"Bearer {token}"}),
+            hourly_limiter=AsyncLimiter(RATE_LIMIT_PER_HOUR, 3600),
+            burst_limiter=AsyncLimiter(BURST_LIMIT_PER_MINUTE, 60),
+            request_semaphore=asyncio.Semaphore(MAX_CONCURRENT_REQUESTS_PER_TOKEN),
+        )
+        _token_states[key] = state
+        while len(_token_states) > TOKEN_STATE_MAX_SIZE:
+            _token_states.popitem(last=False)
+    else:
+        _token_states.move_to_end(key)
+    return state
+
+
+def get_graphql_headers(runtime: ToolRuntime[TaskContext]) -> Mapping[str, str]:
+    """Get headers for authenticated GraphQL requests"""
+    return _get_token_state(runtime.context.token).headers
+
+
+def _update_pacing(state: _TokenState, response: httpx.Response) -> None:
+    """
+    Set how far apart a token's requests go out from its remaining budget.
+
+    Once GitHub reports fewer than RATE_LIMIT_LOW_WATERMARK requests left,
+    the remaining ones are spread evenly over the time until the budget
+    resets instead of running into a hard limit. The spacing is capped at
+    MAX_RATE_LIMIT_WAIT seconds and dropped again above the watermark.
+
+    Args:
+        state: The state of the token the response was sent with.
+        response: The response carrying GitHub's X-RateLimit-* headers.
+    """
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+
+    remaining_requests = int(remaining)
+    if remaining_requests >= RATE_LIMIT_LOW_WATERMARK:
+        state.pacing_interval = 0.0
+        return
+
+    seconds_until_reset = max(0.0, int(reset) - time.time())
+    logger.warning(
+        "GitHub rate limit nearly spent: %d requests left, resets in %.0fs",
+        remaining_requests,
+        seconds_until_reset,
+    )
+    state.pacing_interval = min(
+        seconds_until_reset / max(remaining_requests, 1), MAX_RATE_LIMIT_WAIT
+    )
+
+
+async def _wait_for_send_slot(state: _TokenState) -> None:
+    """
+    Wait until a token's next request may go out under its pacing.
+
+    Each caller reserves its own slot before sleeping, so concurrent
+    requests are spaced pacing_interval apart rather than sent together.
+
+    Args:
+        state: The state of the token about to send.
+    """
+    now = time.monotonic()
+    slot = max(now, state.next_send_at)
+    state.next_send_at = slot + state.pacing_interval
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+
+# Transport failures raised before the request reached GitHub
+_UNSENT_REQUEST_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Phrases in a 403 body that mark GitHub's secondary (abuse) rate limit
+_SECONDARY_RATE_LIMIT_MARKERS = (b"secondary rate limit", b"abuse detection")
+
+
+def _is_mutation(query: str) -> bool:
+    """Whether a GraphQL document is a mutation rather than a read."""
+    return query.lstrip().startswith("mutation")
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for a zero-based attempt number."""
+    delay = RETRY_BACKOFF_BASE * 2**attempt
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _is_graphql_rate_limited(response: httpx.Response) -> bool:
+    """Whether a 200 GraphQL response was rejected with a RATE_LIMITED error."""
+    if b"RATE_LIMITED" not in response.content:
+        return False
+
+    try:
+        payload = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return False
+    if not isinstance(payload, dict):
+        return False
+
+    errors = payload.get("errors") or ()
+    return any(
+        isinstance(error, dict) and error.get("type") == "RATE_LIMITED"
+        for error in errors
+    )
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    """
+    Parse a Retry-After header, given either as seconds or as an HTTP date.
+
+    Args:
+        value: The header value.
+
+    Returns:
+        Seconds to wait, or None if the value is neither form.
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _rate_limit_retry_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+    """
+    Work out how long to wait before retrying a rate-limited response.
+
+    GitHub signals rate limiting with 429, with 403 plus Retry-After, an
+    exhausted X-RateLimit-Remaining or a secondary rate limit message, and
+    for GraphQL with a 200 carrying a RATE_LIMITED error. Other 403s are
+    permission errors and are not retried.
+
+    Args:
+        response: The HTTP response to inspect.
+        attempt: Zero-based number of the attempt that produced the response.
+
+    Returns:
+        Seconds to wait before retrying, or None if the response is not rate-limited.
+    """
+    if response.status_code == 200:
+        if not _is_graphql_rate_limited(response):
+            return None
+    elif response.status_code not in (403, 429):
+        return None
+
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        delay = _retry_after_seconds(retry_after)
+        if delay is not None:
+            return delay
+
+    reset = response.headers.get("X-RateLimit-Reset")
+    if response.headers.get("X-RateLimit-Remaining") == "0" and reset is not None:
+        return max(0.0, int(reset) - time.time())
+
+    if response.status_code != 403 or any(
+        marker in response.content.lower()
+        for marker in _SECONDARY_RATE_LIMIT_MARKERS
+    ):
+        return _backoff_delay(attempt)
+
+    return None
+
+
+@lru_cache(maxsize=256)
+def _encoded_query(query: str) -> Tuple[bytes, str]:
+    """
+    Encode a query document once for reuse across calls.
+
+    Args:
+        query: GraphQL query or mutation document.
+
+    Returns:
+        Tuple of the JSON request body up to its closing brace, so a call only
+        has to encode its variables, and a digest of the document for cache keys.
+    """
+    body_prefix = orjson.dumps({"query": query})[:-1]
+    digest = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+    return body_prefix, digest
+
+
+def _encode_graphql_body(query: str, variables: Optional[Dict[str, Any]]) -> bytes:
+    """Build the JSON request body for a document and its variables."""
+    body_prefix, _ = _encoded_query(query)
+    if not variables:
+        return body_prefix + b"}"
+    return body_prefix + b',"variables":' + orjson.dumps(variables) + b"}"
+
+
+async def _post_graphql(
+    runtime: ToolRuntime[TaskContext], body: bytes, idempotent: bool
+) -> httpx.Response:
+    """
+    Send a GraphQL request body through the shared client within the token's rate limits.
+
+    At most MAX_CONCURRENT_REQUESTS_PER_TOKEN calls per token and
+    MAX_CONCURRENT_REQUESTS across the process are in flight at once. While
+    a token's budget is nearly spent its calls are spaced out before
+    sending, see _update_pacing.
+    Rate-limited responses are retried up to MAX_REQUEST_ATTEMPTS
+    times when GitHub asks for a wait no longer than MAX_RATE_LIMIT_WAIT
+    seconds. Reads are also retried with jittered backoff on transport
+    errors, timeouts and RETRYABLE_STATUS_CODES; mutations only when the
+    request never reached GitHub, so a write is not applied twice.
+
+    Args:
+        runtime: Tool runtime with context containing the token.
+        body: The encoded GraphQL request body.
+        idempotent: Whether the request is a read that is safe to resend.
+
+    Returns:
+        The HTTP response.
+    """
+    state = _get_token_state(runtime.context.token)
+
+    for attempt in range(MAX_REQUEST_ATTEMPTS):
+        last_attempt = attempt == MAX_REQUEST_ATTEMPTS - 1
+
+        await _wait_for_send_slot(state)
+        try:
+            # The token's own cap comes first, so one busy token waiting on it
+            # doesn't hold process-wide slots the other tokens could use
+            async with (
+                state.hourly_limiter,
+                state.burst_limiter,
+                state.request_semaphore,
+                _request_semaphore,
+            ):
+                response = await get_client().post(
+                    GRAPHQL_PATH, content=body, headers=state.headers
+                )
+        except httpx.TransportError as e:
+            if last_attempt or not (
+                idempotent or isinstance(e, _UNSENT_REQUEST_ERRORS)
+            ):
+                raise
+
+            delay = _backoff_delay(attempt)
+            logger.warning(
+                "GitHub request failed (%s), retrying in %.1fs",
+                type(e).__name__,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        _update_pacing(state, response)
+        delay = _rate_limit_retry_delay(response, attempt)
+        if (
+            delay is None
+            and idempotent
+            and response.status_code in RETRYABLE_STATUS_CODES
+        ):
+            delay = _backoff_delay(attempt)
+
+        if delay is None or delay > MAX_RATE_LIMIT_WAIT or last_attempt:
+            break
+
+        logger.warning(
+            "GitHub returned HTTP %s, retrying in %.1fs",
+            response.status_code,
+            delay,
+        )
+        await asyncio.sleep(delay)
+
+    return response
+
+
+def _response_cache_key(
+    token: str, query: str, variables: Optional[Dict[str, Any]]
+) -> str:
+    """Build a stable cache key for a query, its variables and the caller's token."""
+    _, query_digest = _encoded_query(query)
+    raw = orjson.dumps(
+        [token, query_digest, variables or {}], option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _get_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    """Return a cached query result if it has not expired yet."""
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+
+    expires_at, _, data = entry
+    if expires_at <= time.monotonic():
+        del _response_cache[key]
+        return None
+
+    _response_cache.move_to_end(key)
+    return data
+
+
+def _store_cached_response(
+    key: str, scope: Tuple[str, str], data: Dict[str, Any], ttl: float
+) -> None:
+    """Cache a query result, evicting the least recently used entry when full."""
+    _response_cache[key] = (time.monotonic() + ttl, scope, data)
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > RESPONSE_CACHE_MAX_SIZE:
+        _response_cache.popitem(last=False)
+
+
+def invalidate_response_cache(owner: str, repository: str) -> None:
+    """
+    Drops every cached query result and label ID for a repository.
+
+    Reads still in flight for the repository were sent before the write, so
+    they are not stored once they finish.
+
+    Args:
+        owner: Repository owner.
+        repository: Repository name.
+    """
+    scope = (owner, repository)
+    _cache_generations[scope] = _cache_generations.get(scope, 0) + 1
+    _label_id_cache.pop(scope, None)
+    stale_keys = [
+        key for key, (_, entry_scope, _) in _response_cache.items()
+        if entry_scope == scope
+    ]
+    for key in stale_keys:
+        del _response_cache[key]
+
+
+async def _send_graphql_query(
+    runtime: ToolRuntime[TaskContext],
+    query: str,
+    variables: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Send a GraphQL document and return its data, raising on GraphQL errors."""
+    response = await _post_graphql(
+        runtime, _encode_graphql_body(query, variables), not _is_mutation(query)
+    )
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+
+    # Check for GraphQL errors
+    if "errors" in data:
+        raise GraphQLError(data["errors"], data.get("data"))
+
+    return data.get("data", {})
 
 
 async def execute_graphql_query(
     runtime: ToolRuntime[TaskContext],
     query: str,
     variables: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
+    cache_ttl: float = RESPONSE_CACHE_TTL,
+    tolerate_error: Optional[Callable[[Dict[str, Any]], bool]] = None,
 ) -> Dict[str, Any]:
-    """Execute a GraphQL query against GitHub's API"""
-    payload = {"query": query}
-    if variables:
-        payload["variables"] = variables
+    """
+    Execute a GraphQL query against GitHub's API.
+
+    Read queries are served from a short-lived in-process cache when possible,
+    and identical reads already in flight share a single request. Mutations
+    are never cached or shared and invalidate cached reads for the repository.
+
+    Args:
+        runtime: Tool runtime with context containing token, owner and repository.
+        query: GraphQL query or mutation document.
+        variables: Optional variables for the document.
+        use_cache: Whether a read query may be answered from the cache.
+        cache_ttl: Seconds a read result stays cached. Defaults to
+            RESPONSE_CACHE_TTL; slow-changing lookups can keep results longer.
+        tolerate_error: Tells whether a GraphQL error of a read query is
+            expected, e.g. an aliased object that doesn't exist. If every
+            error is, the partial data is returned and cached like any result.
+
+    Returns:
+        The "data" object of the GraphQL response.
+
+    Raises:
+        GraphQLError: If the response carries errors that aren't tolerated.
+    """
+    scope = (runtime.context.owner, runtime.context.repository)
+
+    if _is_mutation(query):
+        result = await _send_graphql_query(runtime, query, variables)
+        invalidate_response_cache(*scope)
+        return result
+
+    cache_key = _response_cache_key(runtime.context.token, query, variables)
+    if use_cache:
+        cached = _get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+    # Only share a request sent since the repository's last write
+    generation = _cache_generations.get(scope, 0)
+    inflight = _inflight_queries.get(cache_key)
+    if inflight is None or inflight[0] != generation:
+        inflight = (
+            generation,
+            asyncio.ensure_future(_send_graphql_query(runtime, query, variables)),
+        )
+        _inflight_queries[cache_key] = inflight
+        entry = inflight
+
+        def forget_inflight(task: "asyncio.Future[Dict[str, Any]]") -> None:
+            if _inflight_queries.get(cache_key) is entry:
+                del _inflight_queries[cache_key]
+            # Mark a failure as retrieved in case every waiter was cancelled
+            if not task.cancelled():
+                task.exception()
+
+        inflight[1].add_done_callback(forget_inflight)
 
-    async with httpx.AsyncClient(headers=get_graphql_headers(runtime)) as client:
-        response = await client.post(GRAPHQL_URL, json=payload)
-        response.raise_for_status()
-        data = response.json()
+    # Shield the shared request so one cancelled caller doesn't cancel the others
+    try:
+        result = await asyncio.shield(inflight[1])
+    except GraphQLError as e:
+        if (
+            tolerate_error is None
+            or not e.data
+            or not all(map(tolerate_error, e.errors))
+        ):
+            raise
+        result = e.data
+    if use_cache and _cache_generations.get(scope, 0) == generation:
+        _store_cached_response(cache_key, scope, result, cache_ttl)
 
-        # Check for GraphQL errors
-        if "errors" in data:
-            error_messages = [
-                error.get("message", "Unknown error") for error in data["errors"]
-            ]
-            raise Exception(f"GraphQL errors: {'; '.join(error_messages)}")
+    return result
 
-        return data.get("data", {})
 
+def _cached_label_ids(owner: str, repository: str) -> Dict[str, str]:
+    """Return the repository's cached label IDs that are still fresh, by name."""
+    labels = _label_id_cache.get((owner, repository))
+    if not labels:
+        return {}
 
-async def get_label_ids_from_names(
-    runtime: ToolRuntime[TaskContext], label_names: List[str]
-) -> List[str]:
+    _label_id_cache.move_to_end((owner, repository))
+    now = time.monotonic()
+    return {
+        name: label_id
+        for name, (expires_at, label_id) in labels.items()
+        if expires_at > now
+    }
+
+
+def _remember_label_ids(
+    owner: str, repository: str, label_ids: Dict[str, str], generation: int
+) -> None:
+    """
+    Cache looked-up label IDs for LABEL_CACHE_TTL seconds.
+
+    Skipped if the repository was written to since the lookup was sent, see
+    invalidate_response_cache.
+    """
+    scope = (owner, repository)
+    if not label_ids or _cache_generations.get(scope, 0) != generation:
+        return
+
+    expires_at = time.monotonic() + LABEL_CACHE_TTL
+    labels = _label_id_cache.setdefault(scope, {})
+    for name, label_id in label_ids.items():
+        labels[name] = (expires_at, label_id)
+    _label_id_cache.move_to_end(scope)
+    while len(_label_id_cache) > LABEL_CACHE_MAX_REPOSITORIES:
+        _label_id_cache.popitem(last=False)
+
+
+def remember_issue_id(
+    owner: str, repository: str, issue_number: int, issue_id: str
+) -> None:
     """
-    Retrieves label IDs from GitHub by their names.
-    
+    Records an issue's GraphQL ID so later lookups skip the network.
+
     Args:
-        runtime: Tool runtime with context containing owner and repository.
-        label_names: List of label names to look up.
-        
-    Returns:
-        List of label IDs matching the provided names.
+        owner: Repository owner.
+        repository: Repository name.
+        issue_number: The issue number.
+        issue_id: The issue's GraphQL node ID.
     """
-    if not label_names:
-        return []
+    cache_key = (owner, repository, issue_number)
+    _missing_issue_cache.pop(cache_key, None)
+    _issue_id_cache[cache_key] = issue_id
+    _issue_id_cache.move_to_end(cache_key)
+    while len(_issue_id_cache) > ISSUE_ID_CACHE_MAX_SIZE:
+        _issue_id_cache.popitem(last=False)
 
-    owner = runtime.context.owner
-    repository = runtime.context.repository
 
-    query = f"""
-    query GetLabelIdsByNames($owner: String!, $name: String!, $first: Int!) {{
+def _remember_missing_issue(owner: str, repository: str, issue_number: int) -> None:
+    """Record that an issue does not exist for MISSING_ISSUE_TTL seconds."""
+    cache_key = (owner, repository, issue_number)
+    _missing_issue_cache[cache_key] = time.monotonic() + MISSING_ISSUE_TTL
+    _missing_issue_cache.move_to_end(cache_key)
+    while len(_missing_issue_cache) > ISSUE_ID_CACHE_MAX_SIZE:
+        _missing_issue_cache.popitem(last=False)
+
+
+def _raise_if_known_missing(owner: str, repository: str, issue_number: int) -> None:
+    """Raise without a request if the issue was recently found not to exist."""
+    cache_key = (owner, repository, issue_number)
+    expires_at = _missing_issue_cache.get(cache_key)
+    if expires_at is None:
+        return
+    if expires_at <= time.monotonic():
+        del _missing_issue_cache[cache_key]
+        return
+
+    raise ValueError(f"Issue #{issue_number} not found in {owner}/{repository}")
+
+
+# Lets label IDs a caller passes be checked against the repository
+LABEL_NODES_SELECTION = (
+    "nodes(ids: $ids) { ... on Label { id name repository { nameWithOwner } } }"
+)
+
+
+@lru_cache(maxsize=128)
+def _issue_and_labels_query(
+    label_count: int, include_issue: bool, include_nodes: bool
+) -> str:
+    """Build the aliased lookup document for resolve_issue_and_label_ids."""
+    variable_definitions = "".join(
+        f", $l{index}: String!" for index in range(label_count)
+    )
+    if include_issue:
+        variable_definitions += ", $number: Int!"
+    if include_nodes:
+        variable_definitions += ", $ids: [ID!]!"
+
+    selections = [
+        f"l{index}: label(name: $l{index}) {{ id }}" for index in range(label_count)
+    ]
+    if include_issue:
+        selections.append("issue(number: $number) { id }")
+
+    return f"""
+    query ResolveIssueAndLabels($owner: String!, $name: String!{variable_definitions}) {{
       repository(owner: $owner, name: $name) {{
-        labels(first: $first) {{
-          nodes {{
-            id
-            name
-          }}
-        }}
+        {" ".join(selections)}
       }}
+      {LABEL_NODES_SELECTION if include_nodes else ""}
     }}
     """
 
-    variables = {
-        "owner": owner,
-        "name": repository,
-        "first": 100,
-    }
-
-    data = await execute_graphql_query(runtime, query, variables)
-    repository_labels = data["repository"]["labels"]["nodes"]
 
-    label_ids = []
-    label_names_set = set[str](label_names)
+def _is_tolerated_lookup_error(error: Dict[str, Any]) -> bool:
+    """Whether a lookup error only reports the issue or a node ID as not found."""
+    path = error.get("path") or ()
+    return error.get("type") == "NOT_FOUND" and (
+        tuple(path) == ("repository", "issue")
+        or (len(path) == 2 and path[0] == "nodes")
+    )
 
-    for label in repository_labels:
-        if label["name"] in label_names_set:
-            label_ids.append(label["id"])
 
-    return label_ids
+async def resolve_issue_and_label_ids(
+    runtime: ToolRuntime[TaskContext],
+    issue_number: int,
+    label_names: List[str],
+    issue_id: Optional[str] = None,
+    label_ids: Optional[List[str]] = None,
+) -> Tuple[str, List[str]]:
+    """
+    Resolves an issue's node ID and label IDs with at most one request.
 
+    Cached IDs are used where available; whatever is missing is fetched in a
+    single aliased query instead of separate issue and label lookups. Found
+    label IDs are kept per repository for LABEL_CACHE_TTL seconds, whatever
+    issue they were looked up for, and writes to the repository drop them.
+    Labels that weren't found are not kept, so a label created next is
+    found right away.
 
-async def get_issue_id(runtime: ToolRuntime[TaskContext], issue_number: int) -> str:
-    """
-    Retrieves the GraphQL ID for a GitHub issue by its number.
-    
     Args:
         runtime: Tool runtime with context containing owner and repository.
-        issue_number: The issue number to look up.
-        
+        issue_number: The issue number.
+        label_names: Label names to resolve.
+        issue_id: The issue's node ID if the caller already knows it. It is
+            checked against issue_number, which needs no request once that
+            number's ID is cached.
+        label_ids: Label node IDs the caller already knows. Each must be a
+            label of this repository, which needs no request once it is cached.
+
     Returns:
-        The GraphQL ID of the issue.
+        Tuple of the issue ID and the unique label IDs, those of label_names
+        first in the same order.
+
+    Raises:
+        ValueError: If the issue or any of the labels does not exist, or
+            issue_id or label_ids don't belong to this repository's issue
+            and labels.
     """
     owner = runtime.context.owner
     repository = runtime.context.repository
 
-    issue_query = """
-      query GetIssueId($owner: String!, $name: String!, $number: Int!) {
-        repository(owner: $owner, name: $name) {
-          issue(number: $number) {
-            id
-          }
+    # Trusting a caller's IDs would let a mutation approved for issue_number
+    # land on any node, even in another repository
+    expected_issue_id = issue_id
+    issue_id = _issue_id_cache.get((owner, repository, issue_number))
+    label_ids_by_name = _cached_label_ids(owner, repository)
+    known_label_ids = set(label_ids_by_name.values())
+    names_to_fetch = [
+        name for name in dict.fromkeys(label_names) if name not in label_ids_by_name
+    ]
+    ids_to_check = [
+        label_id
+        for label_id in dict.fromkeys(label_ids or [])
+        if label_id not in known_label_ids
+    ]
+
+    if issue_id is None:
+        _raise_if_known_missing(owner, repository, issue_number)
+
+    if issue_id is None or names_to_fetch or ids_to_check:
+        variables: Dict[str, Any] = {"owner": owner, "name": repository}
+        if issue_id is None:
+            variables["number"] = issue_number
+        for index, name in enumerate(names_to_fetch):
+            variables[f"l{index}"] = name
+        if ids_to_check:
+            variables["ids"] = ids_to_check
+
+        query = _issue_and_labels_query(
+            len(names_to_fetch), issue_id is None, bool(ids_to_check)
+        )
+        generation = _cache_generations.get((owner, repository), 0)
+        # Found IDs are cached above, so the response itself isn't kept
+        data = await execute_graphql_query(
+            runtime,
+            query,
+            variables,
+            use_cache=False,
+            tolerate_error=_is_tolerated_lookup_error,
+        )
+        repository_data = data["repository"]
+
+        if issue_id is None:
+            issue = repository_data.get("issue")
+            if not issue:
+                _remember_missing_issue(owner, repository, issue_number)
+                raise ValueError(
+                    f"Issue #{issue_number} not found in {owner}/{repository}"
+                )
+            issue_id = issue["id"]
+            remember_issue_id(owner, repository, issue_number, issue_id)
+
+        fetched = {
+            name: repository_data[f"l{index}"]["id"]
+            for index, name in enumerate(names_to_fetch)
+            if repository_data.get(f"l{index}")
         }
-      }
-      """
-
-    issue_data = await execute_graphql_query(
-        runtime,
-        issue_query,
-        {
-            "owner": owner,
-            "name": repository,
-            "number": issue_number,
-        },
-    )
+        # Nodes that aren't labels come back empty, and GitHub compares
+        # owner and repository names case-insensitively
+        name_with_owner = f"{owner}/{repository}".lower()
+        for node in data.get("nodes") or []:
+            if (
+                node
+                and node.get("repository", {}).get("nameWithOwner", "").lower()
+                == name_with_owner
+            ):
+                fetched[node["name"]] = node["id"]
+        _remember_label_ids(owner, repository, fetched, generation)
+        label_ids_by_name.update(fetched)
+        known_label_ids.update(fetched.values())
 
-    return issue_data["repository"]["issue"]["id"]
+    if expected_issue_id is not None and expected_issue_id != issue_id:
+        raise ValueError(
+            f"issue_id {expected_issue_id} is not issue #{issue_number} "
+            f"in {owner}/{repository}"
+        )
+
+    missing = [name for name in label_names if name not in label_ids_by_name]
+    if missing:
+        raise ValueError(
+            f"Labels not found in {owner}/{repository}: {', '.join(missing)}"
+        )
+
+    foreign = [
+        label_id for label_id in label_ids or [] if label_id not in known_label_ids
+    ]
+    if foreign:
+        raise ValueError(
+            f"Not label IDs of {owner}/{repository}: {', '.join(foreign)}"
+        )
+
+    return issue_id, list(
+        dict.fromkeys(
+            [*(label_ids_by_name[name] for name in label_names), *(label_ids or [])]
+        )
+    )
 
 
 # Common GraphQL fragments for reuse
-ISSUE_FRAGMENT = """
-fragment IssueFields on Issue {
+ISSUE_CORE_FRAGMENT = """
+fragment IssueCoreFields on Issue {
   id
   number
   title
@@ -167,6 +905,12 @@ fragment IssueFields on Issue {
   }
   locked
   activeLockReason
+}
+"""
+
+# Cross-references are expensive to resolve, so they are only selected on request
+ISSUE_BRANCHES_FRAGMENT = """
+fragment IssueBranchFields on Issue {
   linkedBranches(first: 10) {
     nodes {
       id
@@ -178,6 +922,11 @@ fragment IssueFields on Issue {
       }
     }
   }
+}
+"""
+
+ISSUE_PULL_REQUESTS_FRAGMENT = """
+fragment IssuePullRequestFields on Issue {
   closedByPullRequestsReferences(first: 10) {
     nodes {
       id
@@ -192,6 +941,11 @@ fragment IssueFields on Issue {
       headRefOid
     }
   }
+}
+"""
+
+ISSUE_RELATIONS_FRAGMENT = """
+fragment IssueRelationsFields on Issue {
   trackedIssues(first: 5) {
     totalCount
     nodes {
@@ -1,24 +1,239 @@
-from fastapi import FastAPI
+import asyncio
+import hashlib
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Union
+import orjson
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import AIMessageChunk, messages_to_dict
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.types import Command
+from pydantic import BaseModel
 from backend.src.agent import create_rag_agent
+from backend.src.agent.main import close_checkpointer, init_checkpointer
+from backend.src.agent.shared.context import TaskContext
+from backend.src.agent.tools.github.utils import close_client, get_client
+
+logger = logging.getLogger(__name__)
+
+AGENT_CACHE_MAX_SIZE = 64
+
+# sha256(token) -> build of that token's agent, least recently used first
+_agent_builds: "OrderedDict[str, asyncio.Future[Any]]" = OrderedDict()
+
+
+class AgentRequest(BaseModel):
+    token: str
+    owner: str
+    repository: str
+    platform: str = "github"
+
+
+class ConversationRequest(AgentRequest):
+    message: str
+
+
+class ResumeRequest(AgentRequest):
+    # One HumanInTheLoopMiddleware decision per pending tool call, in order,
+    # e.g. {"type": "approve"} or {"type": "reject", "message": "..."}
+    decisions: List[Dict[str, Any]]
 
 
 async def lifespan(app: FastAPI):
-    app.state.agent = await create_rag_agent()
+    await init_checkpointer()
+    get_client()
     yield
+    await close_client()
+    await close_checkpointer()
 
 app = FastAPI(lifespan=lifespan)
 
 
+def _token_key(token: str) -> str:
+    """Returns the hash a token is known by, so raw tokens are never stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def _get_owned_conversation(conversation_id: str, token: str) -> CheckpointTuple:
+    """
+    Returns a conversation's latest checkpoint if the token started it.
+
+    Conversations record the hash of the token that created them in their
+    checkpoint metadata. A conversation owned by another token is reported
+    as missing so its existence isn't revealed.
+
+    Args:
+        conversation_id: Thread ID of the conversation.
+        token: GitHub authentication token of the caller.
+
+    Returns:
+        The conversation's latest checkpoint.
+
+    Raises:
+        HTTPException: 404 if the conversation doesn't exist or isn't the caller's.
+    """
+    checkpointer = await init_checkpointer()
+    checkpoint = await checkpointer.aget_tuple(
+        {"configurable": {"thread_id": conversation_id}}
+    )
+    if checkpoint is None or checkpoint.metadata.get("owner") != _token_key(token):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    return checkpoint
+
+
+async def _get_agent(token: str) -> Any:
+    """
+    Returns the compiled agent for a token, building it on first use.
+
+    Concurrent first requests for a token share one build, and failed builds
+    are not kept.
+
+    Args:
+        token: GitHub authentication token the agent's tools run with.
+
+    Returns:
+        The agent, reused across requests made with the same token.
+    """
+    key = _token_key(token)
+
+    build = _agent_builds.get(key)
+    if build is None:
+        build = asyncio.ensure_future(create_rag_agent(token))
+        _agent_builds[key] = build
+
+        def forget_failed_build(task: "asyncio.Future[Any]") -> None:
+            if task.cancelled() or task.exception() is not None:
+                if _agent_builds.get(key) is task:
+                    del _agent_builds[key]
+
+        build.add_done_callback(forget_failed_build)
+
+        while len(_agent_builds) > AGENT_CACHE_MAX_SIZE:
+            _agent_builds.popitem(last=False)
+    else:
+        _agent_builds.move_to_end(key)
+
+    # Shield the shared build so one disconnected client doesn't cancel the others
+    return await asyncio.shield(build)
+
+
+def _encode_event(event: Dict[str, Any]) -> bytes:
+    """Encodes a stream event as one NDJSON line."""
+    return orjson.dumps(event, default=str) + b"\n"
+
+
+async def _stream_conversation(
+    conversation_id: str,
+    request: AgentRequest,
+    agent_input: Union[Dict[str, Any], Command],
+) -> AsyncIterator[bytes]:
+    """
+    Runs the agent and yields its output as NDJSON events.
+
+    Events are {"type": "conversation", "id"} first, then {"type": "token",
+    "content", "node"} per model token and {"type": "interrupt", "id",
+    "value"} when a tool call waits for approval. An interrupted run is
+    continued with POST /conversation/{conversation_id}/resume. The response
+    has already started, so a failed run ends with {"type": "error",
+    "message"} instead of an HTTP error.
+
+    Args:
+        conversation_id: Thread ID the agent's checkpoints are stored under.
+        request: The context to run the agent with.
+        agent_input: New messages, or a Command resuming an interrupted run.
+
+    Yields:
+        Encoded events, one per line.
+    """
+    context = TaskContext(
+        platform=request.platform,
+        token=request.token,
+        owner=request.owner,
+        repository=request.repository,
+    )
+
+    yield _encode_event({"type": "conversation", "id": conversation_id})
+
+    try:
+        agent = await _get_agent(request.token)
+
+        async for mode, data in agent.astream(
+            agent_input,
+            config={
+                "configurable": {"thread_id": conversation_id},
+                # Stored with every checkpoint, see _get_owned_conversation
+                "metadata": {"owner": _token_key(request.token)},
+            },
+            context=context,
+            stream_mode=["messages", "updates"],
+        ):
+            if mode == "messages":
+                message, metadata = data
+                # Tool results are streamed too; only model output is a token
+                if isinstance(message, AIMessageChunk) and message.content:
+                    yield _encode_event(
+                        {
+                            "type": "token",
+                            "content": message.content,
+                            "node": metadata.get("langgraph_node"),
+                        }
+                    )
+            elif "__interrupt__" in data:
+                for interrupt in data["__interrupt__"]:
+                    yield _encode_event(
+                        {
+                            "type": "interrupt",
+                            "id": interrupt.id,
+                            "value": interrupt.value,
+                        }
+                    )
+    except Exception as e:
+        logger.exception("Conversation %s failed", conversation_id)
+        yield _encode_event({"type": "error", "message": str(e)})
+
+
+def _user_message(request: ConversationRequest) -> Dict[str, Any]:
+    """Builds the agent input for a new user message."""
+    return {"messages": [{"role": "user", "content": request.message}]}
+
+
 @app.post("/conversation")
-async def create_conversation(request):
-    pass
+async def create_conversation(request: ConversationRequest):
+    return StreamingResponse(
+        _stream_conversation(str(uuid.uuid4()), request, _user_message(request)),
+        media_type="application/x-ndjson",
+    )
 
 
 @app.post("/conversation/{conversation_id}")
-async def update_conversation(request):
-    pass
+async def update_conversation(conversation_id: str, request: ConversationRequest):
+    await _get_owned_conversation(conversation_id, request.token)
+    return StreamingResponse(
+        _stream_conversation(conversation_id, request, _user_message(request)),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/conversation/{conversation_id}/resume")
+async def resume_conversation(conversation_id: str, request: ResumeRequest):
+    await _get_owned_conversation(conversation_id, request.token)
+    return StreamingResponse(
+        _stream_conversation(
+            conversation_id,
+            request,
+            Command(resume={"decisions": request.decisions}),
+        ),
+        media_type="application/x-ndjson",
+    )
 
 
 @app.get("/conversation/{conversation_id}")
-async def get_conversation(conversation_id: str):
-    pass
+async def get_conversation(conversation_id: str, authorization: str = Header()):
+    token = authorization.removeprefix("Bearer ").strip()
+    checkpoint = await _get_owned_conversation(conversation_id, token)
+
+    messages = checkpoint.checkpoint["channel_values"].get("messages", [])
+    return {"id": conversation_id, "messages": messages_to_dict(messages)}